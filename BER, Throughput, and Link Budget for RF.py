@@ -1,6 +1,26 @@
 import math
+import numpy as np
 import CONSTANTS as C
 
+try:
+    from scipy.special import erfc as _erfc_vec, erfcinv
+except ImportError:
+    # Without SciPy, arrays go through _fast_erfc and the required Eb/N0 is found by bisection
+    _erfc_vec = erfcinv = None
+
+try:
+    import numexpr as ne
+except ImportError:
+    # Without numexpr the SciPy-less array path is evaluated with plain NumPy
+    ne = None
+
+try:
+    from numba import njit
+except ImportError:
+    # Without Numba the bisection runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
 # Constants
 
 c = 299792458.0
@@ -12,8 +32,13 @@ k_db = -228.6
 pi = math.pi
 # Pi
 
+_FSPL_K = 20.0 * math.log10(4.0 * pi / c)
+# Constant term of free-space path loss, 20*log10(4*pi/c) [dB]
+
 
 # Helper functions
+# All link budget and throughput functions accept scalars or NumPy arrays (e.g. for
+# rain/frequency/range sweeps); the > 0 checks then apply to every element.
 
 def db_to_lin(x_db):
     """Convert value from dB to linear (power ratio)."""
@@ -21,29 +46,34 @@ def db_to_lin(x_db):
 
 def lin_to_db(x_lin):
     """Convert value from linear (power ratio) to dB."""
-    return 10.0 * math.log10(x_lin)
+    return 10.0 * np.log10(x_lin)
 
 def w_to_dbw(P_w):
     """Convert power from watts [W] to dBW."""
-    if P_w <= 0:
+    if np.any(P_w <= 0):
         raise ValueError("P_tx_W must be > 0")
-    return 10.0 * math.log10(P_w)
+    return 10.0 * np.log10(P_w)
 
 
 # Link budget functions
 
 def wavelength_m(f_hz):
     """Wavelength [m] from carrier frequency f [Hz]."""
-    if f_hz <= 0:
+    if np.any(f_hz <= 0):
         raise ValueError("f_hz must be > 0")
     return c / f_hz
 
 def fspl_db(R_m, f_hz):
-    """Free-space path loss L_fs [dB] from range R [m] and frequency f [Hz]."""
-    if R_m <= 0:
+    """
+    Free-space path loss L_fs [dB] from range R [m] and frequency f [Hz].
+
+    Uses the closed form L_fs = 20*log10(R) + 20*log10(f) + 20*log10(4*pi/c).
+    """
+    if np.any(R_m <= 0):
         raise ValueError("R_m must be > 0")
-    lam = wavelength_m(f_hz)
-    return 20.0 * math.log10(4.0 * pi * R_m / lam)
+    if np.any(f_hz <= 0):
+        raise ValueError("f_hz must be > 0")
+    return 20.0 * np.log10(R_m) + 20.0 * np.log10(f_hz) + _FSPL_K
 
 def eirp_dbw(P_tx_dBW, G_tx_dBi, L_tx_dB, L_point_tx_dB=0.0):
     """Equivalent isotropically radiated power EIRP [dBW]."""
@@ -59,9 +89,9 @@ def received_carrier_power_dbw(EIRP_dBW, L_path_dB, G_rx_dBi):
 
 def noise_density_dbw_per_hz(T_sys_K):
     """Noise power spectral density N0 [dBW/Hz] from system noise temperature T_sys [K]."""
-    if T_sys_K <= 0:
+    if np.any(T_sys_K <= 0):
         raise ValueError("T_sys_K must be > 0")
-    return k_db + 10.0 * math.log10(T_sys_K)
+    return k_db + 10.0 * np.log10(T_sys_K)
 
 def cn0_dbhz(C_dBW, N0_dBW_per_Hz):
     """Carrier-to-noise-density ratio C/N0 [dB-Hz]."""
@@ -69,9 +99,13 @@ def cn0_dbhz(C_dBW, N0_dBW_per_Hz):
 
 def ebn0_db(CN0_dBHz, Rb_bps, L_impl_dB=0.0):
     """Available Eb/N0 [dB] from C/N0 [dB-Hz] and bit rate Rb [bit/s]."""
-    if Rb_bps <= 0:
+    if np.any(Rb_bps <= 0):
         raise ValueError("Rb_bps must be > 0")
-    Rb_dB = 10.0 * math.log10(Rb_bps)
+    Rb_dB = 10.0 * np.log10(Rb_bps)
+    return ebn0_db_from_dB(CN0_dBHz, Rb_dB, L_impl_dB)
+
+def ebn0_db_from_dB(CN0_dBHz, Rb_dB, L_impl_dB=0.0):
+    """Available Eb/N0 [dB] from C/N0 [dB-Hz] and bit rate already in dB, 10log10(Rb) [dB-bit/s]."""
     return CN0_dBHz - Rb_dB - L_impl_dB
 
 
@@ -84,52 +118,104 @@ def symbol_rate_from_bandwidth(B_occ_hz, alpha):
     Assumption: raised-cosine / RRC shaping, null-to-null occupied bandwidth:
         B_occ ≈ (1 + alpha) * Rs
     """
-    if B_occ_hz <= 0:
+    if np.any(B_occ_hz <= 0):
         raise ValueError("B_occ_hz must be > 0")
-    if alpha < 0:
+    if np.any(alpha < 0):
         raise ValueError("alpha must be >= 0")
     return B_occ_hz / (1.0 + alpha)
 
 def gross_bit_rate_from_symbol_rate(Rs_sps, M):
     """Gross PHY bit rate Rb [bit/s] from symbol rate Rs [sym/s] and constellation size M."""
-    if Rs_sps <= 0:
+    if np.any(Rs_sps <= 0):
         raise ValueError("Rs_sps must be > 0")
-    if M <= 1:
+    if np.any(M <= 1):
         raise ValueError("M must be > 1")
-    bits_per_symbol = math.log2(M)
+    bits_per_symbol = np.log2(M)
     return Rs_sps * bits_per_symbol
 
 
 # BER functions (QPSK uncoded coherent Gray, AWGN)
 
-def ber_qpsk_uncoded_awgn_from_ebn0_lin(ebn0_lin):
-    """Uncoded coherent Gray QPSK BER in AWGN from Eb/N0 (linear)."""
-    if ebn0_lin < 0:
-        raise ValueError("EbN0_lin must be >= 0")
-    # BER = 0.5 * erfc( sqrt(Eb/N0) )
-    return 0.5 * math.erfc(math.sqrt(ebn0_lin))
+def _fast_erfc(x):
+    """
+    Abramowitz & Stegun 7.1.26 approximation of erfc(x) for x >= 0, on scalars or arrays.
 
-def required_ebn0_for_target_ber(BER_target, tol=1e-12, max_iter=200):
+    Absolute error < 1.5e-7; used for array sweeps when SciPy is not available.
     """
-    Required Eb/N0 (linear and dB) to achieve target BER for uncoded QPSK in AWGN.
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return poly * np.exp(-x * x)
 
-    Solve Eb/N0 such that:
-        BER_target = 0.5 * erfc( sqrt(Eb/N0) )
+def ber_qpsk_uncoded_awgn_from_ebn0_lin(ebn0_lin):
     """
-    if not (0.0 < BER_target < 0.5):
-        raise ValueError("BER_target must be between 0 and 0.5 (exclusive)")
+    Uncoded coherent Gray QPSK BER in AWGN from Eb/N0 (linear).
 
-    lo = 0.0
-    hi = 1.0
+    Accepts a scalar or an array of Eb/N0 values; arrays are evaluated in a
+    single vectorized call (e.g. for BER vs Eb/N0 sweeps).
 
-    while ber_qpsk_uncoded_awgn_from_ebn0_lin(hi) > BER_target:
+    Scalars always use math.erfc. Without SciPy, arrays use the _fast_erfc
+    approximation instead, so array results are only accurate to about
+    1.5e-7 absolute (BER), and relatively worse at very low BER: ber(x) and
+    ber([x])[0] can then differ, by ~1% around BER 1e-15.
+    """
+    # BER = 0.5 * erfc( sqrt(Eb/N0) )
+    if np.ndim(ebn0_lin) == 0:
+        if ebn0_lin < 0:
+            raise ValueError("EbN0_lin must be >= 0")
+        return 0.5 * math.erfc(math.sqrt(ebn0_lin))
+
+    ebn0_lin = np.asarray(ebn0_lin, dtype=float)
+    if np.any(ebn0_lin < 0):
+        raise ValueError("EbN0_lin must be >= 0")
+    if _erfc_vec is None:
+        if ne is not None:
+            # Fused _fast_erfc; exp(-sqrt(x)^2) is exp(-x), so only t needs a temporary
+            t = ne.evaluate("1.0 / (1.0 + 0.3275911 * sqrt(x))", local_dict={"x": ebn0_lin})
+            return ne.evaluate(
+                "0.5 * t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))"
+                " * exp(-x)",
+                local_dict={"t": t, "x": ebn0_lin},
+            )
+        return 0.5 * _fast_erfc(np.sqrt(ebn0_lin))
+
+    # Evaluate in place so sqrt(x) does not allocate a second full-size temporary
+    ber = np.sqrt(ebn0_lin)
+    _erfc_vec(ber, out=ber)
+    ber *= 0.5
+    return ber
+
+_TBL_LOG_BER = np.arange(1.0, 15.5, 0.5)
+# -log10(BER) grid for the table below [-]
+
+_TBL_EBN0 = np.array([
+    0.821187207575, 1.725081227371, 2.705947215527, 3.727712373311,
+    4.774767853042, 5.838969516656, 6.915541809546, 8.001449674484,
+    9.094646742044, 10.193689250962, 11.297521329854, 12.405347910681,
+    13.516555646801, 14.630661632574, 15.747278982310, 16.866093036826,
+    17.986844494638, 19.109317185954, 20.233329038299, 21.358725285012,
+    22.485373281018, 23.613158490721, 24.741981344212, 25.871754745972,
+    27.002402080269, 28.133855599127, 29.266055108205, 30.398946886958,
+    31.532482794749,
+])
+# Required Eb/N0 [linear] = erfcinv(2*BER)^2 at each grid point, used to bracket the bisection without SciPy
+
+@njit(cache=True)
+def _bisect_ebn0_for_target_ber(BER_target, lo, hi, tol, max_iter):
+    """Bisection for Eb/N0 (linear) such that 0.5 * erfc( sqrt(Eb/N0) ) = BER_target, starting from [lo, hi]."""
+    # Widen the initial bracket until it contains the solution
+    while 0.5 * math.erfc(math.sqrt(hi)) > BER_target:
+        lo = hi
         hi *= 2.0
         if hi > 1e12:
             raise RuntimeError("Failed to bracket solution for Eb/N0. Check BER_target.")
 
+    while lo > 0.0 and 0.5 * math.erfc(math.sqrt(lo)) <= BER_target:
+        hi = lo
+        lo = 0.0 if lo < 1e-12 else 0.5 * lo
+
     for _ in range(max_iter):
         mid = 0.5 * (lo + hi)
-        ber_mid = ber_qpsk_uncoded_awgn_from_ebn0_lin(mid)
+        ber_mid = 0.5 * math.erfc(math.sqrt(mid))
 
         if ber_mid > BER_target:
             lo = mid
@@ -139,8 +225,31 @@ def required_ebn0_for_target_ber(BER_target, tol=1e-12, max_iter=200):
         if (hi - lo) / max(1.0, hi) < tol:
             break
 
-    ebn0_req_lin = hi
-    ebn0_req_dB = lin_to_db(hi)
+    return hi
+
+def required_ebn0_for_target_ber(BER_target, tol=1e-12, max_iter=200):
+    """
+    Required Eb/N0 (linear and dB) to achieve target BER for uncoded QPSK in AWGN.
+
+    Inverts BER_target = 0.5 * erfc( sqrt(Eb/N0) ) in closed form:
+        Eb/N0 = erfcinv( 2 * BER_target )^2
+    Without SciPy the same equation is solved by bisection to tolerance tol
+    (JIT-compiled when Numba is available), starting from the bracket given
+    by the two nearest entries of a tabulated BER -> Eb/N0 grid.
+    """
+    if not (0.0 < BER_target < 0.5):
+        raise ValueError("BER_target must be between 0 and 0.5 (exclusive)")
+
+    if erfcinv is not None:
+        val = erfcinv(2.0 * BER_target)
+        ebn0_req_lin = float(val * val)
+    else:
+        idx = np.searchsorted(_TBL_LOG_BER, -math.log10(BER_target))
+        lo = _TBL_EBN0[idx - 1] if idx > 0 else 0.0
+        hi = _TBL_EBN0[idx] if idx < len(_TBL_EBN0) else 2.0 * _TBL_EBN0[-1]
+        ebn0_req_lin = _bisect_ebn0_for_target_ber(BER_target, float(lo), float(hi), tol, max_iter)
+
+    ebn0_req_dB = lin_to_db(ebn0_req_lin)
     return ebn0_req_lin, ebn0_req_dB
 
 def rb_max_for_target(CN0_dBHz, EbN0_req_dB, L_impl_dB=0.0):
@@ -209,10 +318,10 @@ N0_dBW_per_Hz = noise_density_dbw_per_hz(T_sys_K)
 CN0_dBHz = cn0_dbhz(C_dBW, N0_dBW_per_Hz)
 # Carrier-to-noise-density ratio C/N0 [dB-Hz]
 
-Rb_gross_dB = 10.0 * math.log10(Rb_gross_bps)
+Rb_gross_dB = lin_to_db(Rb_gross_bps)
 # 10log10(gross PHY bit rate) [dB]
 
-EbN0_avail_dB = ebn0_db(CN0_dBHz, Rb_gross_bps, L_impl_dB)
+EbN0_avail_dB = ebn0_db_from_dB(CN0_dBHz, Rb_gross_dB, L_impl_dB)
 # Available Eb/N0 [dB] using gross PHY bit rate
 
 EbN0_avail_lin = db_to_lin(EbN0_avail_dB)
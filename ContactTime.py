@@ -3,10 +3,59 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from datetime import datetime, timedelta
 from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
 from CONSTANTS import dataVolume
 from math import prod
 import numpy as np
 
+### CONSTANTS
+_MONTHS = {b"Jan": 1, b"Feb": 2, b"Mar": 3, b"Apr": 4, b"May": 5, b"Jun": 6,
+           b"Jul": 7, b"Aug": 8, b"Sep": 9, b"Oct": 10, b"Nov": 11, b"Dec": 12}
+_DAY_US = 86_400_000_000  # Microseconds per day
+
+### FUNCTIONS
+def _parseEpoch(field: bytes) -> datetime:
+    """
+    Parses a GMAT epoch such as b"13 Feb 2026 16:08:27.627" without going through strptime.
+
+    :param field: The 24 bytes holding the epoch.
+    :type field: bytes
+    """
+    return datetime(int(field[7:11]), _MONTHS[field[3:6]], int(field[0:2]),
+                    int(field[12:14]), int(field[15:17]), int(field[18:20]), int(field[21:24]) * 1000)
+
+@lru_cache(maxsize=None)
+def _loadRaw(filename: str) -> tuple[tuple[str, np.ndarray, np.ndarray, np.ndarray], ...]:
+    """
+    Reads a contactLocator file from GMAT. Cached, so building several ContactTimes from the same file parses it only once.
+
+    :param filename: Name of the text file with the contactLocator data from GMAT.
+    :type filename: str
+    :return: ((station, starts, stops, durations), ...) with datetime64[us] epochs and durations in seconds. The arrays are read-only so the cached result cannot be altered.
+    """
+    data = defaultdict(lambda: (list(), list(), list()))
+
+    with (Path("GMATContacts") / filename).open("rb", buffering=1 << 20) as f:
+        for line in f:
+            if line.startswith(b"Observer: "):
+                starts, stops, durations = data[line[10:].rstrip().decode()]
+            elif line[:1] in (b"0", b"1", b"2", b"3"):
+                starts.append(_parseEpoch(line[:24]))
+                stops.append(_parseEpoch(line[28:52]))
+                durations.append(float(line[58:70]))
+
+    raw = list()
+    for station, (starts, stops, durations) in data.items():
+        arrays = (np.array(starts, dtype="datetime64[us]"),
+                  np.array(stops, dtype="datetime64[us]"),
+                  np.array(durations, dtype=np.float64))
+        for array in arrays:
+            array.flags.writeable = False
+        raw.append((station, *arrays))
+
+    return tuple(raw)
+
 ### CLASSES
 class ContactTimes():
     """
@@ -23,7 +72,7 @@ class ContactTimes():
         :type stations: list[str]
         """
         # Initialise variables
-        self.data: dict[str, list[(float, float, float)]] = defaultdict(list) # {station: [(start, stop, duration), ...]}
+        self.data: dict[str, dict[str, np.ndarray]] = dict() # {station: {"start": [...], "stop": [...], "duration": [...]}}
         self.start: datetime  # Start epoch of time interval
         self.stop: datetime  # Stop epoch of time interval
         self.length: int  # Length of time interval in days
@@ -32,16 +81,11 @@ class ContactTimes():
         self.avgContactTime: float  # Average contact time per day [s]
         self.stations = stations  # The stations to take into account, if empty it will account for them all.
 
-        # Read file
-        with open(f"GMATContacts\{filename}") as f:
-            for line in f:
-                if line[:10] == "Observer: ":
-                    station = line[10:-1]
-                if line[0] in ("0", "1", "2", "3"):
-                    start = datetime.strptime(line[:24], "%d %b %Y %H:%M:%S.%f")
-                    stop = datetime.strptime(line[28:52], "%d %b %Y %H:%M:%S.%f")
-                    duration = float(line[58:70])
-                    self.data[station].append((start, stop, duration))
+        # Read file (parsed once per file, then served from cache)
+        for station, starts, stops, durations in _loadRaw(filename):
+            self.data[station] = {"start": starts, "stop": stops, "duration": durations}
+
+        self._station_names = sorted(self.data)  # Station names in plotting order
         
         # Calculate everything
         self.contactTime()
@@ -59,19 +103,20 @@ class ContactTimes():
         :type name: str
         """
         fig, ax = plt.subplots(figsize=(14, 8))
-        station_names = sorted(self.data.keys())
-
-        for i, station in enumerate(station_names):
-            for start, stop, _ in self.data[station]:
-                ax.barh(
-                    y=i,
-                    width=(stop - start).total_seconds() / 60 / 60 / 24,  # convert to days
-                    left=mdates.date2num(start),
-                    height=0.6
-                )
-
-        ax.set_yticks(range(len(station_names)))
-        ax.set_yticklabels(station_names)
+        for i, station in enumerate(self._station_names):
+            # One collection per station instead of one Rectangle per contact window
+            contacts = self.data[station]
+            lefts = mdates.date2num(contacts["start"])
+            widths = (contacts["stop"] - contacts["start"]) / np.timedelta64(1, "D")  # convert to days
+            ax.broken_barh(
+                np.column_stack((lefts, widths)),
+                (i - 0.3, 0.6),
+                facecolors=f"C{i % 10}",
+                rasterized=True
+            )
+
+        ax.set_yticks(range(len(self._station_names)))
+        ax.set_yticklabels(self._station_names)
         ax.xaxis_date()
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M'))
         plt.xticks(rotation=45)
@@ -80,53 +125,66 @@ class ContactTimes():
         ax.set_title("Ground Station Contact Windows")
         plt.tight_layout()
 
-        if show:
-            plt.show()
+        # Drawing happens on show/save, so only that part needs Agg to split long paths into chunks
+        with plt.rc_context({"agg.path.chunksize": 10000}):
+            if show:
+                plt.show()
 
-        if save:
-            plt.savefig(f"Plots\{name}.png")
+            if save:
+                plt.savefig(Path("Plots") / f"{name}.png")
     
     
     def contactTime(self) -> None:
         """
         Calculates all necessary factors to evaluate contact with ground station.
         """
-        intervals = list()
-        merged = list()
-
-        for station in sorted(self.data.keys()):
-            # Only count the times if the station is in the input list, or if no input list was given.
-            if not self.stations or station in self.stations:
-                for start, stop, _ in self.data[station]:
-                    intervals.append((start, stop))
-
-        intervals.sort(key=lambda x: x[0])
-
-        for start, stop in intervals:
-            if not merged:
-                merged.append([start, stop])
-            else:
-                last_start, last_stop = merged[-1]
-                if start <= last_stop:
-                    merged[-1][1] = max(last_stop, stop)
-                else:
-                    merged.append([start, stop])
-
-        for start, stop in merged:
-            self.totalContactTime += (stop - start)
-
-        for start, stop in merged:
-            current = start
-
+        # Only count the times if the station is in the input list, or if no input list was given.
+        # No need to iterate in sorted order, the windows are sorted below.
+        wanted = frozenset(self.stations) if self.stations else None  # Set lookup instead of scanning the list
+        selected = [station for station in self.data if wanted is None or station in wanted]
+        starts = np.concatenate([self.data[station]["start"] for station in selected])
+        stops = np.concatenate([self.data[station]["stop"] for station in selected])
+
+        # Sort by start, then an interval opens a new merged window if it starts after every earlier stop
+        order = np.argsort(starts, kind="stable")
+        starts = starts[order]
+        stops = stops[order]
+        new_window = np.empty(len(starts), dtype=bool)
+        new_window[0] = True
+        new_window[1:] = starts[1:] > np.maximum.accumulate(stops)[:-1]
+
+        first = np.flatnonzero(new_window)
+        merged_starts = starts[first]
+        merged_stops = np.maximum.reduceat(stops, first)
+
+        self.totalContactTime += (merged_stops - merged_starts).sum().item()
+
+        # Contact time per day is accumulated as integer microseconds, keyed by days since 1970-01-01,
+        # and only turned into date/timedelta objects once per day at the end.
+        contact_us = defaultdict(int)
+
+        # Windows within a single day are accumulated in bulk, only those crossing midnight are split
+        day_starts = merged_starts.astype("datetime64[D]")
+        single_day = day_starts == merged_stops.astype("datetime64[D]")
+
+        days, day_index = np.unique(day_starts[single_day].astype(np.int64), return_inverse=True)
+        per_day = np.zeros(len(days), dtype=np.int64)
+        np.add.at(per_day, day_index, (merged_stops - merged_starts)[single_day].astype(np.int64))
+        contact_us.update(zip(days.tolist(), per_day.tolist()))
+
+        for current, stop in zip(merged_starts[~single_day].astype(np.int64).tolist(),
+                                 merged_stops[~single_day].astype(np.int64).tolist()):
             while current < stop:
-                end_of_day = datetime.combine(current.date() + timedelta(days=1), datetime.min.time())
-
-                segment_end = min(stop, end_of_day)
-                self.contactPerDay[current.date()] += (segment_end - current)
+                day = current // _DAY_US
+                segment_end = min(stop, (day + 1) * _DAY_US)
+                contact_us[day] += segment_end - current
                 current = segment_end
 
-        self.start = min(start for start, stop in merged)
-        self.stop   = max(stop for start, stop in merged)
+        for day, us in zip(np.array(list(contact_us), dtype="datetime64[D]").tolist(), contact_us.values()):
+            self.contactPerDay[day] += timedelta(microseconds=us)
+
+        self.start = merged_starts[0].item()
+        self.stop   = merged_stops[-1].item()
         self.length = (self.stop.date() - self.start.date()).days + 1
         self.avgContactTime = self.totalContactTime.total_seconds() / self.length  # Average contact time per day [s]
     
@@ -169,7 +227,7 @@ class ContactTimes():
             print(f"Data rate required based on average: {dataVolume / self.avgContactTime * 1e6:.3f} Mbps\n")
 
         if save:
-            f = open(f"ContactSummaries\{name}.txt", "x")
+            f = open(Path("ContactSummaries") / f"{name}.txt", "x")
             with f:
                 f.write("========== CONTACT SUMMARY ==========\n")
 
@@ -201,13 +259,16 @@ def availability(P_CFLOS: list[float]) -> float:
     """
     Estimates availability based on list of cloud-free line-of-sight probabilities.
     Assumes probabilities are independent.
+    The outage product is taken as a sum of logs, so it does not lose precision when probabilities are close to 1.
 
     :param P_CFLOS: List of cloud-free line-of-sight probabilities.
     :type P_CFLOS: list[float]
     """
-    P_CFLOS = np.array(P_CFLOS)
-    P_outage = np.prod(1 - P_CFLOS)
-    return 1 - P_outage
+    P_CFLOS = np.asarray(P_CFLOS, dtype=float)
+    # 1 - prod(1 - P) = -(exp(sum(log(1 - P))) - 1)
+    # A probability of 1 gives log(0) = -inf, which correctly results in 1, so that warning is silenced
+    with np.errstate(divide="ignore"):
+        return -np.expm1(np.sum(np.log1p(-P_CFLOS)))
 
 ### RUN HERE
 # sixA: ["Delft", "Granada", "Tenerife", "Nemea", "Nicosia", "Porto"]
@@ -1,11 +1,411 @@
 ### IMPORTS
 import os
+import math
 import glob
+import mmap
 import numpy as np
 import pandas as pd
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+try:
+    import numexpr as ne
+except ImportError:
+    # Without numexpr the same expressions are evaluated with plain NumPy
+    ne = None
+
+try:
+    from numba import njit
+except ImportError:
+    # Without Numba the geometry is computed with numexpr or NumPy instead of the compiled kernel
+    njit = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_pq
+except ImportError:
+    # Without pyarrow the processed reports are written with pandas, and no Parquet cache is kept
+    pa = pa_csv = pa_pq = None
+
+### CONSTANTS
+RAD2DEG = np.float64(180.0) / np.pi  # Radians to degrees, a single multiply instead of np.degrees
+_CACHE_VERSION = b"1"  # Bump when the cached columns or the way elevation is computed change
 
 ### FUNCTIONS
+def _station_name(file: str) -> str:
+    """
+    Gets the name of the station a report file is about, e.g. "GMATReports/DelftReport.csv" -> "Delft".
+    """
+    original_name = os.path.basename(file)  # Get original name
+    name_without_csv = os.path.splitext(original_name)[0]  # Remove ".csv"
+    return name_without_csv.replace("Report", "")  # Remove "Report"
+
+if njit is not None:
+    # Cephes rational approximation of atan on [0, 0.66], accurate to ~1 ulp in double precision
+    _ATAN_P = (-8.750608600031904122785E-1, -1.615753718733365076637E1, -7.500855792314704667340E1,
+               -1.228866684490136173410E2, -6.485021904942025371773E1)
+    _ATAN_Q = (2.485846490142306297962E1, 1.650270098316988542046E2, 4.328810604912902668951E2,
+               4.853903996359136964868E2, 1.945506571482613964425E2)
+
+    # No fastmath: it would assume the inputs are finite, and a blank cell in a report is read as NaN
+    @njit(error_model="numpy", cache=True)
+    def _atan2(y: float, x: float) -> float:
+        """
+        Polynomial atan2 (structure as in Jolt's ATan2): reduce to atan of a ratio in [0, 1], then fix up the quadrant.
+        NaN and infinite inputs give the same result as np.arctan2.
+        """
+        if math.isnan(x) or math.isnan(y):
+            return math.nan
+        ax = abs(x)
+        ay = abs(y)
+        swap = ay > ax
+        den = ay if swap else ax
+        if den == 0.0:
+            t = 0.0  # Both zero, the signs still pick the quadrant
+        elif math.isinf(ax) and math.isinf(ay):
+            t = 1.0
+        else:
+            t = (ax if swap else ay) / den
+
+        # atan(t) for t in [0, 1], using atan(t) = pi/4 + atan((t - 1) / (t + 1)) above 0.66
+        big = t > 0.66
+        if big:
+            t = (t - 1.0) / (t + 1.0)
+        z = t * t
+        p = (((_ATAN_P[0] * z + _ATAN_P[1]) * z + _ATAN_P[2]) * z + _ATAN_P[3]) * z + _ATAN_P[4]
+        q = ((((z + _ATAN_Q[0]) * z + _ATAN_Q[1]) * z + _ATAN_Q[2]) * z + _ATAN_Q[3]) * z + _ATAN_Q[4]
+        a = t * (z * p / q) + t
+        if big:
+            a += 0.25 * math.pi
+
+        if swap:
+            a = 0.5 * math.pi - a
+        if math.copysign(1.0, x) < 0.0:
+            a = math.pi - a
+        return math.copysign(a, y)
+
+    # The compiled kernels are single-threaded on purpose: process() already runs one worker process per core
+    @njit(error_model="numpy", cache=True)
+    def _geometry_kernel(X: np.ndarray, Y: np.ndarray, Z: np.ndarray, rho: np.ndarray, elevation: np.ndarray, slant_range: bool) -> None:
+        """
+        Fills slant range (if asked) and elevation [deg] element by element, in a single compiled loop.
+        """
+        for i in range(X.size):
+            xy2 = X[i]*X[i] + Y[i]*Y[i]
+            elevation[i] = _atan2(Z[i], math.sqrt(xy2)) * RAD2DEG
+            if slant_range:
+                rho[i] = math.sqrt(xy2 + Z[i]*Z[i])
+
+def _geometry(X: np.ndarray, Y: np.ndarray, Z: np.ndarray, slant_range: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes slant range and elevation [deg] from the station-centred X, Y, Z coordinates.
+    The horizontal distance is computed once and shared. With Numba everything is a single compiled loop,
+    otherwise with numexpr each expression is a single fused pass, and with plain NumPy np.hypot is used
+    so no squared temporaries are allocated (and extreme coordinates do not overflow).
+
+    :param slant_range: Whether to compute the slant range as well. If not, None is returned in its place.
+    :return: (slant range, elevation)
+    """
+    if njit is not None:
+        elevation = np.empty(X.size)
+        rho = np.empty(X.size if slant_range else 0)
+        _geometry_kernel(X, Y, Z, rho, elevation, slant_range)
+        return (rho if slant_range else None), elevation
+
+    if ne is not None:
+        local_dict = {"X": X, "Y": Y, "Z": Z, "RAD2DEG": RAD2DEG}
+        local_dict["xy2"] = ne.evaluate("X*X + Y*Y", local_dict=local_dict)
+        elevation = ne.evaluate("arctan2(Z, sqrt(xy2)) * RAD2DEG", local_dict=local_dict)
+        rho = ne.evaluate("sqrt(xy2 + Z*Z)", local_dict=local_dict) if slant_range else None
+        return rho, elevation
+
+    xy = np.hypot(X, Y)
+    elevation = np.arctan2(Z, xy)
+    elevation *= RAD2DEG
+    rho = np.hypot(xy, Z) if slant_range else None
+    return rho, elevation
+
+if njit is not None:
+    _POW10 = 10.0 ** np.arange(23)  # Powers of ten that are exact in double precision
+    _NEWLINE = ord("\n")
+    _COMMA = ord(",")
+
+    @njit(cache=True)
+    def _find_newlines(buf: np.ndarray) -> np.ndarray:
+        """
+        Positions of all newlines in buf: counted in a first pass, so the second pass can fill an exactly sized array.
+        """
+        count = 0
+        for i in range(buf.size):
+            if buf[i] == _NEWLINE:
+                count += 1
+
+        newlines = np.empty(count, dtype=np.int64)
+        j = 0
+        for i in range(buf.size):
+            if buf[i] == _NEWLINE:
+                newlines[j] = i
+                j += 1
+        return newlines
+
+    @njit(cache=True)
+    def _parse_float(buf: np.ndarray, i: int, end: int) -> tuple[float, int]:
+        """
+        strtod-style parse of the number starting at buf[i], returns (value, index after the number), or index -1 if
+        there is no number. Up to 18 significant digits are kept exactly as an integer, which is then scaled by an
+        exact power of ten, so the result is within an ulp of the correctly rounded value.
+        """
+        negative = False
+        if i < end and (buf[i] == ord("-") or buf[i] == ord("+")):
+            negative = buf[i] == ord("-")
+            i += 1
+
+        mantissa = 0
+        digits = 0  # Significant digits in the mantissa
+        exp10 = 0
+        seen = False
+        while i < end and ord("0") <= buf[i] <= ord("9"):
+            if digits < 18:
+                mantissa = mantissa * 10 + (buf[i] - ord("0"))
+                digits += mantissa > 0
+            else:
+                exp10 += 1
+            seen = True
+            i += 1
+        if i < end and buf[i] == ord("."):
+            i += 1
+            while i < end and ord("0") <= buf[i] <= ord("9"):
+                if digits < 18:
+                    mantissa = mantissa * 10 + (buf[i] - ord("0"))
+                    digits += mantissa > 0
+                    exp10 -= 1
+                seen = True
+                i += 1
+        if not seen:
+            return 0.0, -1
+
+        if i < end and (buf[i] == ord("e") or buf[i] == ord("E")):
+            i += 1
+            exp_negative = False
+            if i < end and (buf[i] == ord("-") or buf[i] == ord("+")):
+                exp_negative = buf[i] == ord("-")
+                i += 1
+            exponent = 0
+            while i < end and ord("0") <= buf[i] <= ord("9"):
+                exponent = exponent * 10 + (buf[i] - ord("0"))
+                i += 1
+            exp10 += -exponent if exp_negative else exponent
+
+        value = float(mantissa)
+        if exp10 < 0:
+            value = value / _POW10[-exp10] if exp10 >= -22 else value / 10.0**(-exp10)
+        elif exp10 > 0:
+            value = value * _POW10[exp10] if exp10 <= 22 else value * 10.0**exp10
+        return (-value if negative else value), i
+
+    @njit(cache=True)
+    def _parse_xyz(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray, X: np.ndarray, Y: np.ndarray, Z: np.ndarray) -> int:
+        """
+        Parses columns 4, 5 and 6 of every row (buf[starts[r]:ends[r]]) into X, Y and Z.
+        Returns the number of rows that did not have that format.
+        """
+        bad = np.zeros(starts.size, dtype=np.uint8)
+        for r in range(starts.size):
+            i = starts[r]
+            end = ends[r]
+
+            # Skip the epoch, latitude, longitude and altitude
+            commas = 0
+            while i < end and commas < 4:
+                if buf[i] == _COMMA:
+                    commas += 1
+                i += 1
+
+            X[r], i = _parse_float(buf, i, end)
+            if commas < 4 or i < 0 or i >= end or buf[i] != _COMMA:
+                bad[r] = 1
+                continue
+            Y[r], i = _parse_float(buf, i + 1, end)
+            if i < 0 or i >= end or buf[i] != _COMMA:
+                bad[r] = 1
+                continue
+            Z[r], i = _parse_float(buf, i + 1, end)
+            # Z must be the last field of the row (only a "\r" of a Windows line ending may follow)
+            if i < 0 or (i < end and (buf[i] != ord("\r") or i + 1 < end)):
+                bad[r] = 1
+        return bad.sum()
+
+def _read_xyz_mmap(file: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reads the X, Y and Z columns of a GMAT station report by memory-mapping it and parsing only those columns
+    with the compiled tokenizer, skipping any Python-level tokenising.
+
+    :return: (X, Y, Z), or None if the file does not have the expected format (the caller then uses a general csv reader)
+    """
+    if njit is None or os.path.getsize(file) == 0:
+        return None
+
+    with open(file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Header must be 7 columns ending in ...X, ...Y, ...Z, e.g. "...,DefaultSC.DelftC.X,DefaultSC.DelftC.Y,DefaultSC.DelftC.Z"
+        header = mm[:mm.find(b"\n")].rstrip().split(b",")
+        if len(header) != 7 or not all(name.endswith(axis) for name, axis in zip(header[4:], (b".X", b".Y", b".Z"))):
+            return None
+
+        buf = np.frombuffer(mm, dtype=np.uint8)
+        try:
+            newlines = _find_newlines(buf)
+
+            # A row starts after every newline and ends at the next one, the header row is skipped
+            starts = newlines + 1
+            ends = np.append(newlines[1:], buf.size)
+            keep = ends > starts + 1  # Drop empty lines, e.g. after the final newline
+            starts = starts[keep]
+            ends = ends[keep]
+
+            X, Y, Z = np.empty((3, starts.size))
+            bad_rows = _parse_xyz(buf, starts, ends, X, Y, Z)
+        finally:
+            del buf  # The mmap cannot be closed while an array still points into it
+
+    return (X, Y, Z) if bad_rows == 0 else None
+
+def _cache_path(file: str) -> str:
+    """
+    Path of the Parquet cache kept next to a station report, e.g. "GMATReports/DelftReport.csv.parquet".
+    """
+    return file + ".parquet"
+
+def _cache_stamp(file: str) -> dict[bytes, bytes]:
+    """
+    Metadata stored in the Parquet cache to tell whether it still belongs to the csv: size and modification time of the
+    csv, and the cache version. Any mismatch (also an older csv put back with cp -p or rsync -t) makes it a cache miss.
+    """
+    stat = os.stat(file)
+    return {b"source_size": str(stat.st_size).encode(), b"source_mtime_ns": str(stat.st_mtime_ns).encode(),
+            b"version": _CACHE_VERSION}
+
+def _read_report(file: str, save: bool = False) -> tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reads a station report. The whole DataFrame is only kept when the report is saved again afterwards.
+    Otherwise X, Y, Z and the elevation are taken from the Parquet cache if it was made from this exact csv.
+
+    :return: (DataFrame or None, X, Y, Z, elevation or None if it still has to be computed)
+    """
+    if save:
+        # Read csv (everything but the epoch in column 0 is numeric)
+        df = pd.read_csv(file, dtype={i: np.float64 for i in range(1, 7)}, engine="c")
+        return df, df.iloc[:, 4].to_numpy(), df.iloc[:, 5].to_numpy(), df.iloc[:, 6].to_numpy(), None
+
+    cache = _cache_path(file)
+    if pa is not None and os.path.exists(cache):
+        try:
+            # Only the footer is read to check the stamp, the columns only if it matches
+            metadata = pa_pq.read_schema(cache).metadata or dict()
+            stamp = _cache_stamp(file)
+            cached = None
+            if all(metadata.get(key) == value for key, value in stamp.items()):
+                cached = pa_pq.read_table(cache, columns=["X", "Y", "Z", "Elevation"])
+        except (OSError, pa.ArrowInvalid):
+            cached = None  # Unreadable cache, parse the csv as if there was none
+        if cached is not None:
+            return None, *(cached.column(name).to_numpy() for name in ("X", "Y", "Z", "Elevation"))
+
+    # Only the X, Y and Z columns (4, 5, 6) are needed, so skip parsing the rest
+    xyz = _read_xyz_mmap(file)
+    if xyz is not None:
+        return None, *xyz, None
+
+    if pa is not None:
+        # pyarrow's block parser, without its own threads as this already runs in one of the worker processes.
+        # The header names differ per station (e.g. "DefaultSC.DelftC.X"),
+        # so the header is skipped and the columns are picked by position through the generated names f0, f1, ...
+        try:
+            table = pa_csv.read_csv(
+                file,
+                read_options=pa_csv.ReadOptions(use_threads=False, skip_rows=1, autogenerate_column_names=True),
+                convert_options=pa_csv.ConvertOptions(include_columns=["f4", "f5", "f6"],
+                                                      column_types={name: pa.float64() for name in ("f4", "f5", "f6")})
+            )
+        except pa.ArrowInvalid:
+            pass  # E.g. a short or truncated row, which pandas below fills up with NaN
+        else:
+            return None, *(column.to_numpy() for column in table.columns), None
+
+    X, Y, Z = pd.read_csv(file, usecols=[4, 5, 6], dtype=np.float64, engine="c").to_numpy().T
+    return None, X, Y, Z, None
+
+def _process_one(file: str, report: tuple, saveFolder: str = "NewFolder") -> float:
+    """
+    Processes a single station report read by _read_report: adds slant range and elevation and saves
+    the result if the full report was read, and returns the average elevation above 30 deg.
+    Freshly computed elevations are cached as Parquet so later runs can skip the csv.
+    """
+    df, X, Y, Z, elevation = report
+    cached = elevation is not None
+
+    if df is not None:
+        # Compute slant range and elevation
+        rho, elevation = _geometry(X, Y, Z)
+
+        # Build output path
+        new_name = _station_name(file) + "Processed.csv"
+        output_path = os.path.join("ProcessedReports", saveFolder, new_name)
+
+        if pa is not None:
+            # Add the columns to the Arrow table rather than the DataFrame, so pandas never copies its blocks,
+            # and pyarrow's C++ writer avoids pandas' per-row formatting
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.append_column("SlantRange", pa.array(rho)).append_column("Elevation", pa.array(elevation))
+            pa_csv.write_csv(table, output_path)
+        else:
+            # Add columns
+            df["SlantRange"] = rho
+            df["Elevation"] = elevation
+            df.to_csv(output_path, index=False)
+    elif not cached:
+        # Compute elevation
+        _, elevation = _geometry(X, Y, Z, slant_range=False)
+
+    if not cached and pa is not None:
+        # Cache next to the csv, so the next run can skip parsing it. Written to a temporary file first and then moved
+        # into place, so an interrupted run cannot leave a truncated cache behind. The cache is only an optimisation,
+        # so failing to write it (e.g. read-only folder, full disk) does not stop the run.
+        cache = _cache_path(file)
+        tmp = f"{cache}.{os.getpid()}.tmp"
+        try:
+            table = pa.table({"X": X, "Y": Y, "Z": Z, "Elevation": elevation}).replace_schema_metadata(_cache_stamp(file))
+            pa_pq.write_table(table, tmp)
+            os.replace(tmp, cache)
+        except (OSError, pa.ArrowInvalid):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    # Get average elevation value above 30 deg straight from the array (NaN if it is never reached)
+    valid = elevation >= 30.0
+    return elevation[valid].mean() if valid.any() else np.nan
+
+def _process_batch(files: list[str], save: bool = False, saveFolder: str = "NewFolder") -> np.ndarray:
+    """
+    Processes a batch of station reports in one worker process, returning the average elevation above 30 deg of each.
+    The next report is read in a background thread while the current one is computed on (and written),
+    so disk I/O overlaps with the maths. Top-level so it can be sent to worker processes.
+    """
+    avgs = np.empty(len(files))
+
+    with ThreadPoolExecutor(max_workers=1) as io:
+        next_report = io.submit(_read_report, files[0], save) if files else None
+        for i, file in enumerate(files):
+            report = next_report.result()
+            if i + 1 < len(files):
+                next_report = io.submit(_read_report, files[i + 1], save)
+            # Reports are computed one at a time rather than concatenated per batch: each is ~180k rows,
+            # so the per-call overhead is negligible, and this way the next read overlaps with the maths
+            avgs[i] = _process_one(file, report, saveFolder)
+
+    return avgs
+
 def process(Print: bool = True, save: bool = False, saveFolder: str = "NewFolder", stations:list[str]=None):
     """
     ...
@@ -14,51 +414,33 @@ def process(Print: bool = True, save: bool = False, saveFolder: str = "NewFolder
     # Folder containing the report folders
     folder_path = "GMATReports"
 
-    # Get all csv files
-    csv_files = glob.glob(os.path.join(folder_path, "*.csv"))
-
-    # Create list of average elevation above minimum and list of stations, corresponding to each other
-    avg_elevations = list()
-
-    for file in csv_files:
-        # Get the name of the station the file is about
-        original_name = os.path.basename(file)  # Get original name
-        name_without_csv = os.path.splitext(original_name)[0]  # Remove ".csv"
-        station_name = name_without_csv.replace("Report", "")  # Remove "Report"
-        
-        if not stations or station_name in stations:
-            # Read csv
-            df = pd.read_csv(file)
-            
-            # Extract columns
-            X = df.iloc[:, 4]
-            Y = df.iloc[:, 5]
-            Z = df.iloc[:, 6]
-            
-            # Compute slant range
-            rho = np.sqrt(X**2 + Y**2 + Z**2)
-            
-            # Compute elevation
-            elevation = np.degrees(np.arctan2(Z, np.sqrt(X**2 + Y**2)))
-            
-            # Add columns
-            df["SlantRange"] = rho
-            df["Elevation"] = elevation
+    if stations:
+        # Look up the reports of the given stations directly instead of listing the whole folder
+        # (dict.fromkeys drops duplicate names but keeps the order)
+        files = [os.path.join(folder_path, f"{station}Report.csv") for station in dict.fromkeys(stations)]
+        files = [file for file in files if os.path.isfile(file)]
+    else:
+        # Get all csv files
+        files = glob.glob(os.path.join(folder_path, "*.csv"))
 
-            if save:
-                # Build output path
-                new_name = station_name + "Processed.csv"
-                output_path = os.path.join(f"ProcessedReports\{saveFolder}", new_name)
+    if save:
+        os.makedirs(os.path.join("ProcessedReports", saveFolder), exist_ok=True)
 
-                df.to_csv(output_path, index=False)
+    # Every file is independent, so they are spread over the worker processes in one batch per worker
+    workers = min(len(files), os.cpu_count() or 1) or 1  # cpu_count() can be None
+    batches = [files[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        batch_results = ex.map(partial(_process_batch, save=save, saveFolder=saveFolder), batches)
 
-            # Get average elevation values, save to dict
-            valid_elevations = df[df.Elevation >= 30]
-            avg_elevations.append(np.average(valid_elevations.Elevation))
+        # Average elevation above minimum, one per file (in the same order as files)
+        avg_elevations = np.empty(len(files))
+        for i, avgs in enumerate(batch_results):
+            avg_elevations[i::workers] = avgs
 
-    avg_elevation = np.average(avg_elevations)
+    avg_elevation = avg_elevations.mean()
     if Print:
         print(avg_elevation)
 
 ### RUN HERE
-process(False, True, "55deg")
\ No newline at end of file
+if __name__ == "__main__":
+    process(False, True, "55deg")
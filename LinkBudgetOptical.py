@@ -1,10 +1,13 @@
 ### IMPORTS
-from math import pi, exp, log10
+import numpy as np
 
 class LinkBudget():
     """
     Docstring for LinkBudget
 
+    Every parameter may also be a NumPy array (e.g. a sweep over R or theta), in which case
+    the gains and losses are arrays as well, computed in one vectorised pass.
+
     :param D_T: Transmitter aperture
     :param D_R: Receiver aperture
     :param Lambda: Wavelength
@@ -14,36 +17,79 @@ class LinkBudget():
     """
 
     def __init__(self, P_TX, D_T, D_R, Lambda, R, theta, theta_div):
-        self.D_T = D_T  # Transmitter aperture
-        self.D_R = D_R  # Receiver aperture
-        self.Lambda = Lambda  # Wavelength
+        self.D_T = np.asarray(D_T, dtype=float)  # Transmitter aperture
+        self.D_R = np.asarray(D_R, dtype=float)  # Receiver aperture
+        self.Lambda = np.asarray(Lambda, dtype=float)  # Wavelength
+        self.R = np.asarray(R, dtype=float)  # Link range
+        self.theta = np.asarray(theta, dtype=float)  # Beam jitter angle
+        self.theta_div = np.asarray(theta_div, dtype=float)  # Optical beam divergence
+
+        # NumPy only warns on a division by zero, so invalid inputs are rejected here (for arrays, every element is checked)
+        if np.any(self.D_T <= 0):
+            raise ValueError("D_T must be > 0")
+        if np.any(self.Lambda <= 0):
+            raise ValueError("Lambda must be > 0")
+        if np.any(self.R <= 0):
+            raise ValueError("R must be > 0")
+        if np.any(self.theta_div <= 0):
+            raise ValueError("theta_div must be > 0")
+
+        inv_Lambda = 1.0 / self.Lambda  # The only division by the wavelength, the formulas below multiply by this
         c = 3e+8  # Speed of light
-        self.freq = c / Lambda  # Frequency from wavelength
-        self.R = R  # Link range
-        self.theta = theta  # Beam jitter angle
-        self.theta_div = theta_div  # Optical beam divergence
+        self.freq = c * inv_Lambda  # Frequency from wavelength
+
+        # The inputs are fixed after construction, so the gains and losses are computed once here
+        self._pi_inv_L = np.pi * inv_Lambda  # pi / Lambda
+        self._4pi_inv_L = 4 * np.pi * inv_Lambda  # 4 pi / Lambda
+        self._G_T = (self._pi_inv_L * self.D_T)**2  # Gain of transmitting aperture
+        self._L_PT = np.exp(-8 * self.theta**2 / self.theta_div**2)  # Pointing loss of the transmitter
+        self._L_FS = (self._4pi_inv_L * self.R)**2  # Free-space propagation loss
+
+    def dB(self, x, out=None):
+        """
+        Converts a linear ratio to decibels.
+
+        :param x: Linear ratio, scalar or array.
+        :param out: Optional preallocated float array of the same shape as x, the result is written into it without temporaries.
+        :type out: np.ndarray
+        """
+        if out is None:
+            return 10.0 * np.log10(x)
 
-    def dB(self, x):
-        return 10 * log10(x)
+        np.log10(x, out=out)
+        out *= 10.0
+        return out
 
     def G_T(self):
         """
         Gain of transmitting aperture
         """
-        return (pi * self.D_T / self.Lambda)**2
+        return self._G_T
     
     def L_PT(self):
         """
         Pointing loss of the transmitter (assuming a Gaussian-shaped single-mode beam)
         """
-        return exp(-8 * self.theta**2 / self.theta_div**2)
+        return self._L_PT
     
     def L_FS(self):
         """
         Free-space propagation loss
         """
-        return (4 * pi * self.R / self.Lambda)**2
-    
+        return self._L_FS
+
+    def total_gain(self):
+        """
+        Combined gain of the terms computed so far (G_T * L_PT / L_FS), as one product instead of summing dB terms
+        """
+        return self._G_T * self._L_PT / self._L_FS
+
+    def dB_total(self):
+        """
+        Combined gain in dB, a single log10 instead of one per term
+        """
+        return 10.0 * np.log10(self.total_gain())
+
     def G_R(self):
         """
         Gain of the receiving aperture